@@ -61,12 +61,20 @@ Bug fixes:
 """
 
 from pathlib import Path
-import os, sys, json, csv, logging, threading, datetime
+import os, sys, re, json, csv, logging, threading, datetime, time, math, hashlib, io, queue, struct, zlib
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict, deque, namedtuple
+from itertools import accumulate, count
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import requests
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, colorchooser
 from bs4 import BeautifulSoup
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from PIL import Image, ImageChops, ImageColor, ImageDraw, ImageFont, ImageTk
+try: import tomllib
+except ImportError: tomllib = None
 
 def resource_path(relative_path):
     try: base_path = sys._MEIPASS
@@ -88,6 +96,8 @@ _DEFAULT_CONFIG = {
     "font_path": "C:/Windows/Fonts/arial.ttf",
     "output_dir": "overlays", "output_width": 1920,
     "last_match_url": "", "window_geometry": None, "debug_mode": False,
+    "overlay_server": False, "overlay_server_port": 8765, "overlay_template": "",
+    "power_factor": "minor", "anim_fps": 60, "anim_duration": 1.5, "anim_format": "png",
     "colors": {"A":[50,205,50],"C":[255,165,0],"D":[255,105,180],
                "M":[220,20,60],"NS":[138,43,226],"P":[255,215,0],
                "bg":[40,40,40,220],"outline":[255,255,255,255]},
@@ -113,6 +123,9 @@ DEBUG_MODE      = bool(cfg_get("debug_mode", False))
 LOGIN_URL       = "https://shootnscoreit.com/login/"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+SERVER_CACHE_SIZE = 64; EVENT_TICK_MS = 50; EVENT_BATCH_MAX = 500
+JOB_LIMITS = {"scrape": 1, "export": 1, "animate": 1, "import": 1, "stats": 1}; JOB_HISTORY_MAX = 50
+IMPORT_CHUNK_ROWS = 500; IMPORT_MAX_PENDING_CHUNKS = 4; IMPORT_ERRORS_SHOWN = 8
 MAX_PREVIEW_WIDTH = 1100; PREVIEW_BTN_EXTRA_HEIGHT = 100; TOP_PADDING_DEFAULT = 400
 PILL_RADIUS = 18; PILL_FONT_SIZE = 32; PILL_HPAD = 20; PILL_VPAD = 20; PILL_SPACING = 20
 
@@ -218,29 +231,111 @@ def _parse_table_rows_from_soup(soup):
         if candidate_rows: return candidate_rows
     return candidate_rows
 
+def _stage_from_cols(cols):
+    """Stage dict from SSI-ordered columns; None for blank/summary rows, ValueError if malformed."""
+    if not any(str(c).strip() for c in cols): return None
+    if len(cols) < 10: raise ValueError(f"expected 10 columns, got {len(cols)}")
+    if cols[0].lower().startswith(("total", "summary")): return None
+    return {"Stage": cols[0], "HF": round(float(cols[1] or 0), 2),
+        "Time": float(cols[2] or 0), "Rounds": "",
+        "A": int(cols[4] or 0), "C": int(cols[5] or 0), "D": int(cols[6] or 0),
+        "M": int(cols[7] or 0), "P": int(cols[8] or 0), "NS": int(cols[9] or 0)}
+
 def _parse_stage_from_cols(cols, source_label="row"):
-    if len(cols) < 10 or cols[0].lower().startswith(("total", "summary")): return None
-    try:
-        return {"Stage": cols[0], "HF": round(float(cols[1] or 0), 2),
-            "Time": float(cols[2] or 0), "Rounds": "",
-            "A": int(cols[4] or 0), "C": int(cols[5] or 0), "D": int(cols[6] or 0),
-            "M": int(cols[7] or 0), "P": int(cols[8] or 0), "NS": int(cols[9] or 0)}
+    if len(cols) < 10: return None
+    try: return _stage_from_cols(cols)
     except Exception as e:
         logger.error("Failed to parse %s: %s — cols were: %s", source_label, e, cols); return None
 
-def scrape_scores_live(session, match_url):
+def _parse_stages(rows, source_label, check=None):
+    """Parse stage rows, calling check() per row so a cancelled job stops promptly."""
+    stages = []
+    for i, cols in enumerate(rows):
+        if check: check()
+        s = _parse_stage_from_cols(cols, f"{source_label} {i}")
+        if s: stages.append(s)
+    return stages
+
+def scrape_scores_live(session, match_url, check=None):
     r = session.get(match_url, timeout=15)
+    if check: check()
     soup = BeautifulSoup(r.text, "html.parser")
-    return [s for i, c in enumerate(_parse_table_rows_from_soup(soup))
-            for s in [_parse_stage_from_cols(c, f"live row {i}")] if s]
+    return _parse_stages(_parse_table_rows_from_soup(soup), "live row", check)
 
-def scrape_scores_debug_from_csv():
+def scrape_scores_debug_from_csv(check=None):
     """Resolve debug_rows.csv via app_dir() — correct in both script and PyInstaller exe."""
     csv_path = app_dir() / "debug_rows.csv"
     if not csv_path.exists(): return []
     with open(csv_path, "r", encoding="utf-8", newline="") as f:
-        return [s for i, row in enumerate(csv.reader(f))
-                for s in [_parse_stage_from_cols(row, f"CSV row {i}")] if s]
+        return _parse_stages(csv.reader(f), "CSV row", check)
+
+
+# ------------------------
+# IMPORT
+# ------------------------
+# Column order _stage_from_cols expects, and the header names accepted for it
+IMPORT_FIELDS = ("Stage", "HF", "Time", "Rounds", "A", "C", "D", "M", "P", "NS")
+_IMPORT_KEYS = {k.lower(): k for k in IMPORT_FIELDS + ("Competitor",)}
+
+def _stage_from_record(rec, header=None):
+    """Stage dict from one import record: a CSV row (keyed by header if given) or a JSON line."""
+    if isinstance(rec, Exception): raise rec   # the reader already failed on this line
+    if header is not None:
+        if len(rec) != len(header): raise ValueError(f"expected {len(header)} columns, got {len(rec)}")
+        rec = dict(zip(header, rec))
+    elif isinstance(rec, str): rec = json.loads(rec)
+    if isinstance(rec, list): return _stage_from_cols([str(c) for c in rec])
+    if not isinstance(rec, dict): raise ValueError("expected a JSON object or array")
+    rec = {_IMPORT_KEYS.get(str(k).strip().lower(), k): v for k, v in rec.items()}
+    if "Stage" not in rec: raise ValueError("no Stage column")
+    s = _stage_from_cols(["" if rec.get(k) is None else str(rec.get(k)) for k in IMPORT_FIELDS])
+    if s:
+        if rec.get("Rounds") not in (None, ""): s["Rounds"] = str(rec["Rounds"])
+        if rec.get("Competitor") not in (None, ""): s["Competitor"] = str(rec["Competitor"])
+    return s
+
+# Records are yielded as (line number, record, header); a line the reader itself
+# cannot handle (csv.Error, undecodable bytes) is yielded as the exception so
+# that it is reported like any other malformed row.
+
+def _iter_csv_records(f):
+    reader = csv.reader(f); header = None
+    while True:
+        try: row = next(reader)
+        except StopIteration: return
+        except csv.Error as e: yield reader.line_num, e, None; continue
+        if header is None and reader.line_num == 1 and {"stage", "hf"} <= {c.strip().lower() for c in row}:
+            header = [c.strip() for c in row]; continue
+        if any("\ufffd" in c for c in row): yield reader.line_num, ValueError("invalid UTF-8 byte"), None
+        elif any(c.strip() for c in row): yield reader.line_num, row, header
+
+def _iter_jsonl_records(f):
+    for line_no, line in enumerate(f, start=1):
+        if "\ufffd" in line: yield line_no, ValueError("invalid UTF-8 byte"), None
+        elif line.strip(): yield line_no, line, None
+
+def iter_stage_file(path, chunk_rows=IMPORT_CHUNK_ROWS, check=None):
+    """Stream stages from a CSV or JSON Lines results file, chunk_rows at a time.
+
+    CSV files may have a header row (any order, as written by Export CSV) or
+    use the positional SSI layout of debug_rows.csv. Yields (stages, errors)
+    where errors is a list of (line number, message) for malformed rows,
+    which are skipped rather than aborting the import — including lines that
+    are not valid UTF-8 or that the csv module rejects. The reader holds
+    only the current chunk; the caller decides how many rows it keeps.
+    """
+    is_jsonl = str(path).lower().endswith((".jsonl", ".ndjson"))
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        stages = []; errors = []
+        for line_no, rec, header in (_iter_jsonl_records(f) if is_jsonl else _iter_csv_records(f)):
+            if check: check()
+            try:
+                s = _stage_from_record(rec, header)
+                if s: stages.append(normalize_stage(s))
+            except (ValueError, csv.Error) as e: errors.append((line_no, str(e)))
+            if len(stages) >= chunk_rows or len(errors) >= chunk_rows:
+                yield stages, errors; stages = []; errors = []
+        if stages or errors: yield stages, errors
 
 
 # ------------------------
@@ -258,57 +353,918 @@ def normalize_stage(stage):
             logger.error("normalize_stage: could not convert %s — %s", k, e); s[k] = 0
     return s
 
+# ------------------------
+# STAGE STORE
+# ------------------------
+_MISSING = object()
+_STORE_VERSIONS = count(1)
+
+class StageStore:
+    """Compact column store for the table's stage rows.
+
+    A stage dict costs ~0.7 KB; here numbers live in typed arrays and text
+    in interned-string lists, ~64 bytes per row. Values a column cannot hold
+    (text typed into a number cell, missing numbers, extra keys) go into a
+    sparse per-row overlay. Reading a row builds a fresh dict, so callers
+    change rows only through item assignment or extend().
+
+    snapshot() returns a read-only store sharing the columns; the first
+    later write copies them, so exports and statistics keep a consistent
+    view without copying rows up front. version changes on every write and
+    is unique across stores.
+    """
+    NUM_FIELDS = {"Time": "d", "HF": "d", "A": "i", "C": "i", "D": "i", "M": "i", "NS": "i", "P": "i"}
+    STR_FIELDS = ("Stage", "Rounds", "Competitor")
+    __slots__ = ("_num", "_str", "_odd", "_n", "_shared", "version")
+
+    def __init__(self, stages=()):
+        self._num = {k: array(t) for k, t in self.NUM_FIELDS.items()}
+        self._str = {k: [] for k in self.STR_FIELDS}
+        self._odd = {}   # row index -> {key: value}; _MISSING marks an absent number
+        self._n = 0; self._shared = False; self.version = next(_STORE_VERSIONS)
+        self.extend(stages)
+
+    def __len__(self): return self._n
+
+    def __getitem__(self, i):
+        if i < 0: i += self._n
+        if not 0 <= i < self._n: raise IndexError("stage index out of range")
+        s = {}; odd = self._odd.get(i)
+        for k, col in self._str.items():
+            if col[i] is not None: s[k] = col[i]
+        for k, col in self._num.items(): s[k] = col[i]
+        if odd:
+            for k, v in odd.items():
+                if v is _MISSING: s.pop(k, None)
+                else: s[k] = v
+        return s
+
+    def __iter__(self): return map(self.__getitem__, range(self._n))
+
+    def __setitem__(self, i, stage):
+        if i < 0: i += self._n
+        if not 0 <= i < self._n: raise IndexError("stage index out of range")
+        self._detach(); self._store(i, stage); self.version = next(_STORE_VERSIONS)
+
+    def extend(self, stages):
+        self._detach()
+        for s in stages:
+            for col in self._num.values(): col.append(0)
+            for col in self._str.values(): col.append(None)
+            self._n += 1; self._store(self._n - 1, s)
+        self.version = next(_STORE_VERSIONS)
+
+    def snapshot(self):
+        snap = StageStore.__new__(StageStore)
+        snap._num = self._num; snap._str = self._str; snap._odd = self._odd
+        snap._n = self._n; snap.version = self.version
+        snap._shared = self._shared = True
+        return snap
+
+    def column(self, key):
+        """All values of one field in row order, None where a row has none."""
+        col = self._num.get(key)
+        if col is None: col = self._str.get(key)
+        if col is None: col = [None] * self._n
+        over = [(i, odd[key]) for i, odd in self._odd.items() if key in odd]
+        if not over: return col
+        col = list(col)
+        for i, v in over: col[i] = None if v is _MISSING else v
+        return col
+
+    def _detach(self):
+        if not self._shared: return
+        self._num = {k: array(c.typecode, c) for k, c in self._num.items()}
+        self._str = {k: list(c) for k, c in self._str.items()}
+        self._odd = dict(self._odd); self._shared = False
+
+    def _store(self, i, stage):
+        odd = {}
+        for k, col in self._num.items():
+            v = stage.get(k, _MISSING)
+            try:
+                if type(v) is not (float if col.typecode == "d" else int): raise TypeError
+                col[i] = v
+            except (TypeError, OverflowError): col[i] = 0; odd[k] = v
+        for k, col in self._str.items():
+            v = stage.get(k)
+            if v is None or isinstance(v, str): col[i] = None if v is None else sys.intern(v)
+            else: col[i] = None; odd[k] = v
+        for k, v in stage.items():
+            if k not in self._num and k not in self._str: odd[k] = v
+        if odd: self._odd[i] = odd
+        else: self._odd.pop(i, None)
+
+# ------------------------
+# STATISTICS
+# ------------------------
+HIT_KEYS = ("A", "C", "D", "M", "NS", "P")
+SCORE_VALUES = {"minor": {"A": 5, "C": 3, "D": 1, "M": -10, "NS": -10, "P": -10},
+                "major": {"A": 5, "C": 4, "D": 2, "M": -10, "NS": -10, "P": -10}}
+STAT_COLUMNS = ("Points", "TotalTime", "TotalPoints", "StagePct", "HFRank")
+
+def _stage_column(stages, key):
+    if isinstance(stages, StageStore): return stages.column(key)
+    return [s.get(key) for s in stages]
+
+def _num_column(stages, key, conv):
+    out = []
+    for v in _stage_column(stages, key):
+        try: out.append(conv(v or 0))
+        except (TypeError, ValueError): out.append(conv(0))
+    return out
+
+class MatchStats:
+    """Derived per-row metrics for one stage table, stored column-wise.
+
+    Points use IPSC scoring for the power factor and never go below zero.
+    TotalTime/TotalPoints are running totals in table order per "Competitor"
+    (the whole table when that column is absent). When the table holds full
+    results — some stage appears on more than one row — StagePct is HF as a
+    percentage of the stage winner and HFRank is the placing on that stage;
+    otherwise both are None.
+    """
+    def __init__(self, power_factor, columns):
+        self.power_factor = power_factor; self.columns = columns
+
+    def __len__(self): return len(self.columns["Points"])
+
+    def row(self, i): return {k: col[i] for k, col in self.columns.items()}
+
+class StatRows:
+    """Read-only sequence of stage dicts merged with their MatchStats row.
+
+    Merged rows are built on access from a StageStore snapshot, so exports,
+    previews and the overlay server never copy the table. When stats is not
+    known yet it is computed on first access — on whichever thread reads the
+    rows first, normally an export worker or the overlay server.
+    """
+    __slots__ = ("stages", "power_factor", "_stats", "_lock")
+
+    def __init__(self, stages, stats=None, power_factor="minor"):
+        self.stages = stages; self.power_factor = power_factor; self._stats = stats
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            with self._lock:
+                if self._stats is None: self._stats = compute_match_stats(self.stages, self.power_factor)
+        return self._stats
+
+    def __len__(self): return len(self.stages)
+
+    def __getitem__(self, i): return {**self.stages[i], **self.stats.row(i)}
+
+def compute_match_stats(stages, power_factor="minor"):
+    weights = SCORE_VALUES.get(power_factor)
+    if weights is None:
+        logger.error("compute_match_stats: unknown power factor %r, using minor", power_factor)
+        weights = SCORE_VALUES["minor"]
+    hf = _num_column(stages, "HF", float); time_ = _num_column(stages, "Time", float)
+    raw = [0] * len(stages)
+    for k in HIT_KEYS:
+        w = weights[k]; raw = [p + w * h for p, h in zip(raw, _num_column(stages, k, int))]
+    points = [p if p > 0 else 0 for p in raw]
+
+    comp = ["" if c is None else c for c in _stage_column(stages, "Competitor")]
+    if len(set(comp)) <= 1:
+        total_time = [round(t, 2) for t in accumulate(time_)]; total_points = list(accumulate(points))
+    else:
+        run_t = {}; run_p = {}; total_time = []; total_points = []
+        for c, t, p in zip(comp, time_, points):
+            run_t[c] = run_t.get(c, 0.0) + t; run_p[c] = run_p.get(c, 0) + p
+            total_time.append(round(run_t[c], 2)); total_points.append(run_p[c])
+
+    names = ["" if n is None else str(n) for n in _stage_column(stages, "Stage")]
+    field = {}
+    for n, h in zip(names, hf): field.setdefault(n, []).append(h)
+    if len(field) < len(names):
+        for hfs in field.values(): hfs.sort()
+        best = {n: hfs[-1] for n, hfs in field.items()}
+        pct = [round(h / best[n] * 100, 2) if best[n] > 0 else 0.0 for n, h in zip(names, hf)]
+        rank = [len(field[n]) - bisect_right(field[n], h) + 1 for n, h in zip(names, hf)]
+        pct = array("d", pct); rank = array("q", rank)
+    else: pct = rank = [None] * len(stages)
+    return MatchStats(power_factor, {"Points": array("q", points), "TotalTime": array("d", total_time),
+        "TotalPoints": array("q", total_points), "StagePct": pct, "HFRank": rank})
+
+
+# ------------------------
+# TEMPLATES
+# ------------------------
+# An overlay template describes the pills left to right. Colours are either an
+# overlay colour key from Settings ("A", "bg", ...), a PIL colour name, or an
+# [R,G,B(,A)] list. "decimals" formats the value as a float, "optional" pills
+# are skipped when the value is empty, and a pill without a "field" is a fixed
+# label. Templates are JSON or TOML files selected via the "overlay_template"
+# config key; this built-in template is the classic look.
+DEFAULT_TEMPLATE = {
+    "font_size": PILL_FONT_SIZE, "radius": PILL_RADIUS, "hpad": PILL_HPAD,
+    "vpad": PILL_VPAD, "spacing": PILL_SPACING, "outline_width": 2,
+    "background": "bg", "outline": "outline",
+    "pills": [
+        {"label": "Stage",  "field": "Stage",  "default": "", "color": "white", "baseline_offset": 4},
+        {"label": "Time",   "field": "Time",   "default": 0, "decimals": 2, "color": "white"},
+        {"label": "HF",     "field": "HF",     "default": 0, "decimals": 2, "color": "white"},
+        {"label": "Rounds", "field": "Rounds", "optional": True, "color": "white"},
+        {"label": "A",  "field": "A",  "default": 0, "color": "A"},
+        {"label": "C",  "field": "C",  "default": 0, "color": "C"},
+        {"label": "D",  "field": "D",  "default": 0, "color": "D"},
+        {"label": "M",  "field": "M",  "default": 0, "color": "M"},
+        {"label": "NS", "field": "NS", "default": 0, "color": "NS"},
+        {"label": "P",  "field": "P",  "default": 0, "color": "P"},
+    ],
+}
+
+class PillPlan(namedtuple("PillPlan", "label field default decimals optional color baseline_offset")):
+    __slots__ = ()
+
+    def text(self, stage_info):
+        """Pill text for a stage, or None when an optional pill has no value.
+
+        A field that is missing or None (e.g. StagePct on a single-competitor
+        table) takes the pill's default.
+        """
+        if self.field is None: return self.label
+        val = stage_info.get(self.field)
+        if val is None: val = self.default
+        if self.optional and not val: return None
+        return self.format(val)
+
+    def format(self, val):
+        if self.decimals is not None and val not in (None, ""): val = f"{float(val):.{self.decimals}f}"
+        return f"{self.label}: {val}" if self.label else str(val)
+
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (10, 10)))
+GLYPH_CHARSET = "0123456789.:- "
+
+class GlyphModel:
+    """Arithmetic textbbox for strings built from a small character set.
+
+    For horizontal FreeType text, textbbox spans x from 0 to the ceiling of the
+    summed advances (kerning included, 1/64 px exact), and y over the extremes
+    of the individual glyphs. Pill texts like "HF: 7.43" or "A: 112" can thus
+    be measured from per-glyph advances, per-pair kerning and per-glyph
+    top/bottom, without laying the string out. Glyphs that overhang their
+    advance box, or any pair that measures differently from textbbox, are
+    dropped at build time; bbox() returns None for them and the caller falls
+    back to textbbox.
+    """
+    __slots__ = ("adv", "kern", "top", "bottom")
+
+    def __init__(self, font, charset, reference):
+        self.adv = {}; self.kern = {}; self.top = {}; self.bottom = {}
+        for c in dict.fromkeys(charset):
+            bb = reference(c); adv = font.getlength(c)
+            if bb[0] == 0 and bb[2] == math.ceil(adv):
+                self.adv[c] = adv; self.top[c] = bb[1]; self.bottom[c] = bb[3]
+        chars = list(self.adv)
+        for a in chars:
+            for b in chars:
+                k = font.getlength(a + b) - self.adv[a] - self.adv[b]
+                if k: self.kern[a, b] = k
+        bad = {c for a in chars for b in chars if self.bbox(a + b) != tuple(reference(a + b)) for c in (a, b)}
+        for c in bad: del self.adv[c]
+        self.kern = {ab: k for ab, k in self.kern.items() if ab[0] in self.adv and ab[1] in self.adv}
+
+    _cache = {}
+
+    @classmethod
+    def build(cls, font, labels=()):
+        """GlyphModel for digits, punctuation and the given labels, or None if the font can't be modelled.
+
+        Models are cached per font file, size and character set, so a colour
+        change that recompiles the render plan does not re-measure the font.
+        """
+        if not isinstance(font, ImageFont.FreeTypeFont): return None
+        charset = GLYPH_CHARSET + "".join(labels)
+        key = (font.path, font.size, charset) if isinstance(font.path, str) else None
+        model = cls._cache.get(key) if key else None
+        if model is None:
+            try: model = cls(font, charset, lambda t: _MEASURE_DRAW.textbbox((0, 0), t, font=font))
+            except Exception as e:
+                logger.error("GlyphModel: falling back to textbbox — %s", e); return None
+            if key: cls._cache[key] = model
+        return model
+
+    def bbox(self, text):
+        adv = self.adv; kern = self.kern; top = self.top; bottom = self.bottom
+        if not text: return None
+        width = 0.0; t = b = None; prev = None
+        for c in text:
+            a = adv.get(c)
+            if a is None: return None
+            width += a
+            if prev is not None: width += kern.get((prev, c), 0.0)
+            ct = top[c]; cb = bottom[c]
+            if t is None or ct < t: t = ct
+            if b is None or cb > b: b = cb
+            prev = c
+        return (0, t, math.ceil(width), b)
+
+class RenderPlan(namedtuple("RenderPlan",
+        "key font radius hpad vpad spacing outline_width bg_color outline_color pills glyphs measure_cache")):
+    """Template compiled against a font and the current colours — build via get_render_plan()."""
+    __slots__ = ()
+    _MEASURE_CACHE_MAX = 4096
+
+    def measure(self, text):
+        """textbbox of text in the plan font — arithmetic via GlyphModel where possible, memoised."""
+        bb = self.measure_cache.get(text)
+        if bb is None:
+            bb = self.glyphs.bbox(text) if self.glyphs else None
+            if bb is None: bb = _MEASURE_DRAW.textbbox((0, 0), text, font=self.font)
+            if len(self.measure_cache) >= self._MEASURE_CACHE_MAX: self.measure_cache.clear()
+            self.measure_cache[text] = bb
+        return bb
+
+_PLAN_CACHE = {}; _PLAN_LOCK = threading.Lock(); _TEMPLATE_FILES = {}
+_DEFAULT_TEMPLATE_HASH = hashlib.sha1(json.dumps(DEFAULT_TEMPLATE, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _load_template_file(path):
+    """Return (hash, template dict) for a JSON/TOML template; re-read only when the file changes."""
+    st = os.stat(path); stamp = (path, st.st_mtime_ns, st.st_size)
+    cached = _TEMPLATE_FILES.get(path)
+    if cached and cached[0] == stamp: return cached[1], cached[2]
+    with open(path, "rb") as f: raw = f.read()
+    if path.lower().endswith(".toml"):
+        if tomllib is None: raise ValueError("TOML templates need Python 3.11 or newer")
+        tpl = tomllib.loads(raw.decode("utf-8"))
+    else: tpl = json.loads(raw.decode("utf-8"))
+    digest = hashlib.sha1(raw).hexdigest()
+    _TEMPLATE_FILES[path] = (stamp, digest, tpl)
+    return digest, tpl
+
+def _resolve_color(spec, overlay_colors):
+    if isinstance(spec, (list, tuple)): return tuple(int(c) for c in spec)
+    if spec in overlay_colors: return overlay_colors[spec]
+    return ImageColor.getrgb(str(spec))
+
+def compile_template(template, font_path, overlay_colors, key=None):
+    """Resolve fonts, colours and fixed-label measurements once into an immutable RenderPlan."""
+    size = int(template.get("font_size", PILL_FONT_SIZE))
+    try: font = ImageFont.truetype(resource_path(template["font"]) if template.get("font") else font_path, size)
+    except: font = ImageFont.load_default()
+    pills = []
+    for i, p in enumerate(template.get("pills") or []):
+        if not isinstance(p, dict) or ("label" not in p and "field" not in p):
+            raise ValueError(f"Template pill {i} needs a label or a field")
+        dec = p.get("decimals")
+        pills.append(PillPlan(str(p.get("label", "")), p.get("field") or None, p.get("default", ""),
+            None if dec is None else int(dec), bool(p.get("optional", False)),
+            _resolve_color(p.get("color", "white"), overlay_colors), int(p.get("baseline_offset", 0))))
+    if not pills: raise ValueError("Template has no pills")
+    plan = RenderPlan(key, font, int(template.get("radius", PILL_RADIUS)),
+        int(template.get("hpad", PILL_HPAD)), int(template.get("vpad", PILL_VPAD)),
+        int(template.get("spacing", PILL_SPACING)), int(template.get("outline_width", 2)),
+        _resolve_color(template.get("background", "bg"), overlay_colors),
+        _resolve_color(template.get("outline", "outline"), overlay_colors), tuple(pills),
+        GlyphModel.build(font, [pp.label for pp in pills]), {})
+    for pp in plan.pills:
+        if pp.field is None: plan.measure(pp.label)
+    return plan
+
+def get_render_plan(font_path=FONT_PATH):
+    """Cached RenderPlan for the configured template, keyed by template hash, font and colours.
+
+    A broken template is logged and the built-in default is used instead, so
+    exports and the preview keep working while the file is being edited.
+    """
+    oc = get_overlay_colors(); tpl_path = CONFIG.get("overlay_template") or ""
+    digest, tpl = _DEFAULT_TEMPLATE_HASH, DEFAULT_TEMPLATE
+    if tpl_path:
+        try: digest, tpl = _load_template_file(resource_path(tpl_path))
+        except Exception as e:
+            logger.error("Overlay template %s could not be loaded, using default — %s", tpl_path, e)
+    key = (digest, str(font_path), tuple(sorted(oc.items())))
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        with _PLAN_LOCK:
+            plan = _PLAN_CACHE.get(key)
+            if plan is None:
+                try: plan = compile_template(tpl, font_path, oc, key)
+                except Exception as e:
+                    if tpl is DEFAULT_TEMPLATE: raise
+                    logger.error("Overlay template %s is invalid, using default — %s", tpl_path, e)
+                    plan = compile_template(DEFAULT_TEMPLATE, font_path, oc, key)
+                _PLAN_CACHE[key] = plan
+    return plan
+
+
 # ------------------------
 # OVERLAY
 # ------------------------
-def make_overlay(stage_info, font_path=FONT_PATH, outpath=None, output_width=None, top_padding=TOP_PADDING_DEFAULT):
+PlacedPill = namedtuple("PlacedPill", "plan text bbox x w")
+OverlayLayout = namedtuple("OverlayLayout", "size y h pills")
+
+def layout_overlay(stage_info, plan, output_width, top_padding=TOP_PADDING_DEFAULT):
+    """Pill texts, measurements and positions for one stage — shared by stills and animations."""
+    pills = [(pp, tx) for pp in plan.pills for tx in [pp.text(stage_info)] if tx is not None]
+    bbs = [plan.measure(tx) for _, tx in pills]
+    nw = [(mn[2]-mn[0])+2*plan.hpad for mn in bbs]; ph = [(mn[3]-mn[1])+2*plan.vpad for mn in bbs]
+    max_h=max(ph); scale=min(1.0,output_width/(sum(nw)+plan.spacing*(len(pills)-1)))
+    tsw=sum(int(w*scale) for w in nw)+plan.spacing*(len(pills)-1)
+    x=max(20,(output_width-tsw)//2); placed=[]
+    for i,((pp,tx),mn) in enumerate(zip(pills,bbs)):
+        pw=int(nw[i]*scale); placed.append(PlacedPill(pp,tx,mn,x,pw)); x+=pw+plan.spacing
+    return OverlayLayout((output_width,top_padding+max_h),top_padding,max_h,tuple(placed))
+
+def _draw_pill_text(draw, plan, pill, text, bb, x, y, h):
+    tw=bb[2]-bb[0]; th=bb[3]-bb[1]
+    ty2=y+(h-th)//2-bb[1]+pill.plan.baseline_offset
+    draw.text((x+(pill.w-tw)//2-bb[0],ty2),text,font=plan.font,fill=pill.plan.color)
+
+def make_overlay(stage_info, font_path=FONT_PATH, outpath=None, output_width=None, top_padding=TOP_PADDING_DEFAULT, plan=None):
     if output_width is None: output_width = OUTPUT_WIDTH
-    _oc = get_overlay_colors()
-    colors = {k: _oc[k] for k in ("A","C","D","M","NS","P")}
-    bg_color = _oc["bg"]; outline_color = _oc["outline"]
-    try: font_value = ImageFont.truetype(font_path, PILL_FONT_SIZE)
-    except: font_value = ImageFont.load_default()
-    pill_data = [("Stage", stage_info.get("Stage",""), "white"),
-        ("Time", f"{float(stage_info.get('Time',0)):.2f}", "white"),
-        ("HF",   f"{float(stage_info.get('HF',0)):.2f}", "white")]
-    if stage_info.get("Rounds"): pill_data.append(("Rounds", stage_info["Rounds"], "white"))
-    for key in ("A","C","D","M","NS","P"): pill_data.append((key, stage_info.get(key,0), colors.get(key,"white")))
-    _dd = ImageDraw.Draw(Image.new("RGBA",(10,10)))
-    def pill_text(k, v=None): return str(k) if v is None else f"{k}: {v}"
-    nw=[]; ph=[]
-    for lbl,val,_ in pill_data:
-        tx=pill_text(lbl,val); mn=_dd.textbbox((0,0),tx,font=font_value)
-        nw.append((mn[2]-mn[0])+2*PILL_HPAD); ph.append((mn[3]-mn[1])+2*PILL_VPAD)
-    max_h=max(ph); scale=min(1.0,output_width/(sum(nw)+PILL_SPACING*(len(pill_data)-1)))
-    tsw=sum(int(w*scale) for w in nw)+PILL_SPACING*(len(pill_data)-1)
-    x=max(20,(output_width-tsw)//2); y=top_padding
-    img=Image.new("RGBA",(output_width,top_padding+max_h),(0,0,0,0))
+    if plan is None: plan = get_render_plan(font_path)
+    lay=layout_overlay(stage_info,plan,output_width,top_padding); y=lay.y
+    img=Image.new("RGBA",lay.size,(0,0,0,0))
     draw=ImageDraw.Draw(img)
-    for i,(lbl,val,col) in enumerate(pill_data):
-        tx=pill_text(lbl,val); mn=_dd.textbbox((0,0),tx,font=font_value)
-        tw=mn[2]-mn[0]; th=mn[3]-mn[1]; pw=int(nw[i]*scale)
-        ty2=y+(max_h-th)//2-mn[1]+(4 if lbl=="Stage" else 0)
-        draw.rounded_rectangle([x,y,x+pw,y+max_h],radius=PILL_RADIUS,outline=outline_color,width=2,fill=bg_color)
-        draw.text((x+(pw-tw)//2-mn[0],ty2),tx,font=font_value,fill=col)
-        x+=pw+PILL_SPACING
+    for p in lay.pills:
+        draw.rounded_rectangle([p.x,y,p.x+p.w,y+lay.h],radius=plan.radius,outline=plan.outline_color,width=plan.outline_width,fill=plan.bg_color)
+        _draw_pill_text(draw,plan,p,p.text,p.bbox,p.x,y,lay.h)
     if outpath: img.save(outpath,"PNG"); return outpath
     return img
 
+def overlay_filename(stage_info, row, rows):
+    """File stem for table row `row` (1-based) of `rows`: zero-padded row number, then the stage name.
+
+    Full-results tables repeat stage names, so the row number keeps every row's file distinct."""
+    name=str(stage_info.get("Stage") or f"stage_{row}").replace(" ","_").replace(".","")
+    return f"{row:0{len(str(rows))}d}_{name}"
+
+
+# ------------------------
+# ANIMATION
+# ------------------------
+# Timeline as fractions of the sequence: pill i starts sliding up at
+# ANIM_STAGGER*i/(n-1) and settles ANIM_SLIDE later; numbers count up from zero
+# until ANIM_COUNT_END, then the final overlay holds to the last frame.
+ANIM_SLIDE = 0.3; ANIM_STAGGER = 0.2; ANIM_COUNT_END = 0.85
+ANIM_PNG_COMPRESS = 1; ANIM_WORKERS = min(8, os.cpu_count() or 2); ANIM_APNG_WORKERS = 2
+
+_PILL_LAYERS = {}; _PILL_LAYERS_LOCK = threading.Lock(); _PILL_LAYERS_MAX = 256
+
+def _pill_layer(plan, w, h):
+    """Cached pill background (fill + outline) as its own RGBA image."""
+    key = (w, h, plan.radius, plan.outline_width, plan.bg_color, plan.outline_color)
+    layer = _PILL_LAYERS.get(key)
+    if layer is None:
+        layer = Image.new("RGBA", (w+1, h+1), (0, 0, 0, 0))
+        ImageDraw.Draw(layer).rounded_rectangle([0, 0, w, h], radius=plan.radius,
+            outline=plan.outline_color, width=plan.outline_width, fill=plan.bg_color)
+        with _PILL_LAYERS_LOCK:
+            if len(_PILL_LAYERS) >= _PILL_LAYERS_MAX: _PILL_LAYERS.clear()
+            _PILL_LAYERS[key] = layer
+    return layer
+
+def _ease_out(p): p = min(1.0, max(0.0, p)); return 1 - (1 - p) ** 3
+
+class _ApngWriter:
+    """Streaming APNG encoder — each frame is written as soon as the next one differs.
+
+    Pillow's save_all keeps every frame image until the end (about 3.6 MB per
+    1920 px frame, 320 MB for 90 frames), so frames are PNG-encoded one at a
+    time here and their IDAT data re-wrapped as APNG frame chunks. Only the
+    previous frame image and one encoded frame are held. Like Pillow, each
+    frame stores just the region that changed (dispose none, blend source),
+    and runs of identical frames become one frame with a longer delay. The
+    frame count in acTL is patched in close(). Frames go to path + ".part",
+    which close() renames to path and abort() deletes, so a cancelled or
+    failed render never leaves a truncated APNG behind.
+    """
+    def __init__(self, path, fps, loop=0):
+        self._path = str(path); self._f = open(self._path + ".part", "wb"); self._fps = int(round(fps)) or 1; self._loop = loop
+        self._seq = 0; self._count = 0; self._actl_pos = None
+        self._prev = None; self._pending = None   # [x, y, w, h, idat, run]
+
+    def _chunk(self, ctype, data):
+        self._f.write(struct.pack(">I", len(data)) + ctype + data
+            + struct.pack(">I", zlib.crc32(ctype + data) & 0xffffffff))
+
+    @staticmethod
+    def _encode(img):
+        buf = io.BytesIO(); img.save(buf, "PNG"); data = buf.getvalue(); pos = 8; ihdr = None; idat = []
+        while pos < len(data):
+            n, ctype = struct.unpack(">I4s", data[pos:pos+8]); body = data[pos+8:pos+8+n]; pos += 12 + n
+            if ctype == b"IHDR": ihdr = body
+            elif ctype == b"IDAT": idat.append(body)
+        return ihdr, b"".join(idat)
+
+    def add(self, img):
+        if self._prev is None:
+            ihdr, idat = self._encode(img)
+            self._f.write(b"\x89PNG\r\n\x1a\n"); self._chunk(b"IHDR", ihdr)
+            self._actl_pos = self._f.tell(); self._chunk(b"acTL", struct.pack(">II", 0, self._loop))
+            self._pending = [0, 0, img.width, img.height, idat, 1]
+        else:
+            bbox = ImageChops.difference(self._prev, img).getbbox(alpha_only=False)
+            if bbox is None: self.repeat(); return
+            self._flush(); _, idat = self._encode(img.crop(bbox))
+            self._pending = [bbox[0], bbox[1], bbox[2] - bbox[0], bbox[3] - bbox[1], idat, 1]
+        self._prev = img
+
+    def repeat(self): self._pending[5] += 1
+
+    def _flush(self):
+        x, y, w, h, idat, run = self._pending
+        self._chunk(b"fcTL", struct.pack(">IIIIIHHBB", self._seq, w, h, x, y, run, self._fps, 0, 0)); self._seq += 1
+        if self._count == 0: self._chunk(b"IDAT", idat)
+        else: self._chunk(b"fdAT", struct.pack(">I", self._seq) + idat); self._seq += 1
+        self._count += 1; self._pending = None
+
+    def close(self):
+        if self._pending: self._flush()
+        self._chunk(b"IEND", b"")
+        if self._actl_pos is not None:
+            self._f.seek(self._actl_pos); self._chunk(b"acTL", struct.pack(">II", self._count, self._loop))
+        self._f.close(); os.replace(self._path + ".part", self._path)
+
+    def abort(self):
+        self._f.close()
+        try: os.remove(self._path + ".part")
+        except OSError: pass
+
+def render_overlay_sequence(stage_info, out_base, fps=60, duration=1.5, fmt="png",
+        font_path=FONT_PATH, output_width=None, top_padding=TOP_PADDING_DEFAULT, plan=None,
+        check=None, on_frame=None):
+    """Render one stage as an animation: pills slide up into place while numbers count up.
+
+    fmt "png" writes out_base_0000.png, out_base_0001.png, ... (an image
+    sequence Resolve imports as one clip); "apng" streams a single animated
+    out_base.png through _ApngWriter. Uses layout_overlay, so the last frame matches make_overlay.
+    Frames are composited from cached pill layers: once every pill has
+    settled, only the counting text regions are redrawn over a static base,
+    and frames whose texts did not change reuse the previous encoded frame.
+    check() is called per frame for cancellation; on_frame() after each frame.
+    If rendering is cancelled or fails, the files written so far are removed
+    before the exception propagates. Returns the number of frames written.
+    """
+    if output_width is None: output_width = OUTPUT_WIDTH
+    if plan is None: plan = get_render_plan(font_path)
+    lay = layout_overlay(stage_info, plan, output_width, top_padding)
+    y0 = lay.y; h = lay.h; n = len(lay.pills)
+    frames = max(2, int(round(fps * duration)))
+    counting = {}   # pill index -> final numeric value
+    for i, p in enumerate(lay.pills):
+        val = stage_info.get(p.plan.field, p.plan.default) if p.plan.field else None
+        if p.plan.decimals is not None or (isinstance(val, (int, float)) and not isinstance(val, bool)):
+            try: counting[i] = float(val)
+            except (TypeError, ValueError): pass
+    layers = [_pill_layer(plan, p.w, h) for p in lay.pills]
+    # Pills whose text never changes and fits inside the pill get it baked into their layer
+    baked = set()
+    for i, p in enumerate(lay.pills):
+        if i in counting or p.bbox[2] - p.bbox[0] > p.w: continue
+        layers[i] = layers[i].copy(); _draw_pill_text(ImageDraw.Draw(layers[i]), plan, p, p.text, p.bbox, 0, 0, h)
+        baked.add(i)
+
+    # When the layout is shrunk to fit, texts can spill over neighbouring pills
+    # and must be drawn in pill order, so the settled-base shortcut is skipped.
+    padded = all(p.w >= p.bbox[2] - p.bbox[0] + 2 * plan.hpad for p in lay.pills)
+
+    # Settled base: every pill background plus the texts that never change
+    base = Image.new("RGBA", lay.size, (0, 0, 0, 0)); bdraw = ImageDraw.Draw(base)
+    for i, p in enumerate(lay.pills):
+        base.paste(layers[i], (p.x, y0))
+        if i not in counting and i not in baked: _draw_pill_text(bdraw, plan, p, p.text, p.bbox, p.x, y0, h)
+
+    def _text(i, c):
+        p = lay.pills[i]
+        if i not in counting or c >= 1.0: return p.text
+        v = counting[i] * c
+        return p.plan.format(v if p.plan.decimals is not None else int(round(v)))
+
+    out_base = str(out_base); apng = _ApngWriter(f"{out_base}.png", fps) if fmt == "apng" else None
+    prev_key = prev_data = prev_img = None; written = 0
+    try:
+        for f in range(frames):
+            if check: check()
+            t = f / (frames - 1)
+            offsets = tuple(int(round((1 - _ease_out((t - ANIM_STAGGER * i / max(1, n - 1)) / ANIM_SLIDE)) * (h + 1)))
+                for i in range(n))
+            c = _ease_out(t / ANIM_COUNT_END)
+            texts = tuple(_text(i, c) for i in range(n))
+            key = (offsets, texts)
+            if key != prev_key:
+                if any(offsets) or not padded:
+                    img = Image.new("RGBA", lay.size, (0, 0, 0, 0)); draw = ImageDraw.Draw(img)
+                    for i, p in enumerate(lay.pills):
+                        if offsets[i] > h: continue
+                        img.paste(layers[i], (p.x, y0 + offsets[i]))
+                        if i not in baked:
+                            _draw_pill_text(draw, plan, p, texts[i], p.bbox if texts[i] == p.text else plan.measure(texts[i]), p.x, y0 + offsets[i], h)
+                else:
+                    img = base.copy(); draw = ImageDraw.Draw(img)
+                    for i in counting:
+                        p = lay.pills[i]
+                        _draw_pill_text(draw, plan, p, texts[i], p.bbox if texts[i] == p.text else plan.measure(texts[i]), p.x, y0, h)
+                prev_key = key; prev_img = img; prev_data = None
+            if apng:
+                if prev_data is None: apng.add(prev_img); prev_data = b""   # handed to the writer
+                else: apng.repeat()
+            else:
+                if prev_data is None:
+                    buf = io.BytesIO(); prev_img.save(buf, "PNG", compress_level=ANIM_PNG_COMPRESS); prev_data = buf.getvalue()
+                written += 1
+                with open(f"{out_base}_{f:04d}.png", "wb") as fh: fh.write(prev_data)
+            if on_frame: on_frame()
+    except Exception:
+        if apng: apng.abort()
+        for f in range(written):
+            try: os.remove(f"{out_base}_{f:04d}.png")
+            except OSError: pass
+        raise
+    if apng: apng.close()
+    return frames
+
+
+# ------------------------
+# OVERLAY SERVER
+# ------------------------
+def overlay_etag(stage_info, font_path=FONT_PATH, output_width=None):
+    """Stable hash of everything that changes the rendered PNG — stage data, template, colours, font, width."""
+    if output_width is None: output_width = OUTPUT_WIDTH
+    key = json.dumps([stage_info, get_render_plan(font_path).key, int(output_width)],
+        sort_keys=True, default=str)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+class OverlayCache:
+    """Thread-safe LRU of rendered overlay PNG bytes, keyed by ETag."""
+    def __init__(self, maxsize=SERVER_CACHE_SIZE):
+        self._items = OrderedDict(); self._maxsize = maxsize; self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None: self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._items[key] = data; self._items.move_to_end(key)
+            while len(self._items) > self._maxsize: self._items.popitem(last=False)
+
+class _OverlayRequestHandler(BaseHTTPRequestHandler):
+    _STAGE_RE = re.compile(r"^/stage/(\d+)\.png$")
+
+    def do_GET(self): self._serve(send_body=True)
+    def do_HEAD(self): self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        path = self.path.split("?", 1)[0]
+        overlay = self.server.overlay
+        if path == "/current.png": index = None
+        else:
+            m = self._STAGE_RE.match(path)
+            if not m: self.send_error(404, "Use /current.png or /stage/<n>.png"); return
+            index = int(m.group(1)) - 1
+        try: etag, data = overlay.render(index, if_none_match=self.headers.get("If-None-Match"))
+        except Exception as e:
+            logger.error("Overlay server render failed for %s: %s", path, e, exc_info=True)
+            self.send_error(500, "Render failed"); return
+        if etag is None: self.send_error(404, "No such stage"); return
+        if data is None:
+            self.send_response(304); self.send_header("ETag", f'"{etag}"'); self.end_headers(); return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body: self.wfile.write(data)
+
+    def log_message(self, format, *args): pass
+
+class OverlayServer:
+    """Local HTTP server for OBS browser/image sources.
+
+    Serves /stage/<n>.png (1-based) and /current.png (the selected table row)
+    from an in-memory LRU, rendering on demand via make_overlay. The Tk thread
+    only calls update() and select(), which store a reference and an index in
+    constant time. Rows are read (and, for StatRows, merged) one at a time on
+    the server threads when requested; ETags are memoised per row until the
+    rows or the render plan (template, colours) change. Polling never touches
+    tkinter and never blocks the UI.
+    """
+    def __init__(self, port, host="127.0.0.1"):
+        self.host = host; self.port = int(port)
+        self.cache = OverlayCache()
+        self._snapshot = ((), {}); self._current = None   # (rows, {index: (plan key, etag)}), selection
+        self._renders = {}; self._renders_lock = threading.Lock()   # etag -> lock held while rendering it
+        self._httpd = None
+
+    def update(self, stages):
+        """Call from the Tk thread when the stage rows change.
+
+        stages is kept by reference — pass an immutable sequence such as the
+        StatRows from ScoringApp._overlay_rows(), not the live table list.
+        """
+        self._snapshot = (stages, {})
+
+    def select(self, current):
+        """Call from the Tk thread when the selected row changes."""
+        self._current = current
+
+    def render(self, index, if_none_match=None):
+        """Return (etag, png_bytes); png_bytes is None when the client's ETag matches."""
+        stages, etags = self._snapshot
+        if index is None: index = self._current if self._current is not None else 0
+        if not 0 <= index < len(stages): return None, None
+        stage = stages[index]; key = get_render_plan(FONT_PATH).key
+        cached = etags.get(index)
+        if cached is None or cached[0] != key: cached = etags[index] = (key, overlay_etag(stage))
+        etag = cached[1]
+        if if_none_match and etag in if_none_match: return etag, None
+        data = self.cache.get(etag)
+        if data is None:
+            # Several OBS sources polling the same stage render it once; different
+            # stages (e.g. every source after a colour change) render concurrently.
+            with self._renders_lock: lock = self._renders.setdefault(etag, threading.Lock())
+            with lock:
+                data = self.cache.get(etag)
+                if data is None:
+                    buf = io.BytesIO(); make_overlay(stage, font_path=FONT_PATH).save(buf, "PNG")
+                    data = buf.getvalue(); self.cache.put(etag, data)
+            with self._renders_lock:
+                if self._renders.get(etag) is lock: del self._renders[etag]
+        return etag, data
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _OverlayRequestHandler)
+        self._httpd.daemon_threads = True; self._httpd.overlay = self
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown(); self._httpd.server_close(); self._httpd = None
+
+
+# ------------------------
+# UI EVENTS
+# ------------------------
+EV_PROGRESS = "progress"; EV_DONE = "done"; EV_ERROR = "error"
+EV_CANCELLED = "cancelled"; EV_JOBS = "jobs"; EV_ROWS = "rows"
+UIEvent = namedtuple("UIEvent", "kind job payload")
+
+class UIEventBus:
+    """Thread-safe hand-off from background workers to the Tk main loop.
+
+    Workers call post() from any thread; nothing else in a worker may touch
+    tkinter. The Tk thread drains the queue on a single periodic tick, keeping
+    only the latest progress event per job in each batch so a large export
+    cannot flood the event loop.
+    """
+    def __init__(self):
+        self._queue = queue.Queue(); self._pending = deque(); self._handlers = {}
+
+    def subscribe(self, kind, handler): self._handlers.setdefault(kind, []).append(handler)
+
+    def post(self, kind, job=None, **payload): self._queue.put(UIEvent(kind, job, payload))
+
+    def drain(self, max_events=EVENT_BATCH_MAX):
+        """Dispatch queued events — Tk thread only."""
+        batch = []
+        try:
+            while len(batch) < max_events: batch.append(self._queue.get_nowait())
+        except queue.Empty: pass
+        last_progress = {ev.job: i for i, ev in enumerate(batch) if ev.kind == EV_PROGRESS}
+        self._pending.extend(ev for i, ev in enumerate(batch)
+            if ev.kind != EV_PROGRESS or last_progress[ev.job] == i)
+        # Handlers may open modal dialogs, whose nested event loop re-enters
+        # drain(); sharing _pending keeps dispatch order intact across that.
+        while self._pending:
+            ev = self._pending.popleft()
+            for handler in self._handlers.get(ev.kind, ()):
+                try: handler(ev)
+                except Exception as e: logger.error("UI event handler failed for %s/%s: %s", ev.kind, ev.job, e, exc_info=True)
+
+    def attach(self, widget, interval=EVENT_TICK_MS):
+        """Start the periodic drain tick on a Tk widget."""
+        def _tick():
+            widget.after(interval, _tick)   # reschedule first so ticks continue under modal dialogs
+            self.drain()
+        widget.after(interval, _tick)
+
+
+# ------------------------
+# JOBS
+# ------------------------
+class JobCancelled(Exception):
+    """Raised inside a job at a cancellation checkpoint."""
+
+class JobError(Exception):
+    """A job failure with a user-facing dialog title and message."""
+    def __init__(self, title, message):
+        super().__init__(message); self.title = title
+
+class Job:
+    QUEUED = "queued"; RUNNING = "running"; DONE = "done"; FAILED = "failed"; CANCELLED = "cancelled"
+
+    def __init__(self, job_id, kind, name, run, events):
+        self.id = job_id; self.kind = kind; self.name = name; self._run = run; self._events = events
+        self.state = Job.QUEUED; self.started = None; self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self): return self.state in (Job.QUEUED, Job.RUNNING)
+
+    def cancel(self): self._cancel.set()
+
+    def check_cancelled(self):
+        """Cancellation checkpoint — call from the job's scrape/render loops."""
+        if self._cancel.is_set(): raise JobCancelled()
+
+    def progress(self, text): self._events.post(EV_PROGRESS, self, text=text)
+
+    def duration(self):
+        if self.started is None: return None
+        return (self.finished or time.monotonic()) - self.started
+
+class JobScheduler:
+    """Runs named job types on worker threads with per-type concurrency limits.
+
+    submit() queues a job; run(job) executes on its own thread and returns the
+    EV_DONE payload, raises JobError for a user-facing failure, or stops at a
+    job.check_cancelled() checkpoint. Every state change is posted to the UI
+    event bus, so callbacks always arrive on the Tk thread.
+    """
+    def __init__(self, events, limits=JOB_LIMITS):
+        self._events = events; self._limits = dict(limits)
+        self._jobs = []; self._lock = threading.Lock(); self._next_id = 1
+
+    def submit(self, kind, name, run):
+        with self._lock:
+            job = Job(self._next_id, kind, name, run, self._events); self._next_id += 1
+            self._jobs.append(job); self._prune()
+        self._events.post(EV_JOBS, job); self._pump()
+        return job
+
+    def cancel(self, job):
+        with self._lock:
+            queued = job.state == Job.QUEUED
+            job.cancel()
+            if queued: job.state = Job.CANCELLED; job.finished = time.monotonic()
+        if queued: self._events.post(EV_CANCELLED, job)
+        self._events.post(EV_JOBS, job)
+
+    def jobs(self):
+        with self._lock: return list(self._jobs)
+
+    def clear_finished(self):
+        with self._lock: self._jobs = [j for j in self._jobs if j.active]
+        self._events.post(EV_JOBS, None)
+
+    def _prune(self):
+        finished = [j for j in self._jobs if not j.active]
+        for j in finished[:max(0, len(finished) - JOB_HISTORY_MAX)]: self._jobs.remove(j)
+
+    def _pump(self):
+        started = []
+        with self._lock:
+            running = {}
+            for j in self._jobs:
+                if j.state == Job.RUNNING: running[j.kind] = running.get(j.kind, 0) + 1
+            for j in self._jobs:
+                if j.state == Job.QUEUED and running.get(j.kind, 0) < self._limits.get(j.kind, 1):
+                    j.state = Job.RUNNING; j.started = time.monotonic()
+                    running[j.kind] = running.get(j.kind, 0) + 1; started.append(j)
+        for j in started:
+            self._events.post(EV_JOBS, j)
+            threading.Thread(target=self._work, args=(j,), daemon=True).start()
+
+    def _work(self, job):
+        kind, payload = EV_DONE, {}
+        try:
+            job.check_cancelled(); payload = job._run(job) or {}
+            state = Job.DONE
+        except JobCancelled: state, kind = Job.CANCELLED, EV_CANCELLED
+        except JobError as e: state, kind, payload = Job.FAILED, EV_ERROR, {"title": e.title, "message": str(e)}
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.name, e, exc_info=True)
+            state, kind, payload = Job.FAILED, EV_ERROR, {"title": f"{job.name} failed", "message": str(e)}
+        with self._lock: job.state = state; job.finished = time.monotonic()
+        self._events.post(kind, job, **payload); self._events.post(EV_JOBS, job)
+        self._pump()
+
 
 # ============================================================
 # CANVAS TABLE
 # ============================================================
 class CanvasTable(tk.Frame):
     """Scrollable table on tk.Canvas — per-cell colour, hover, selection accent."""
-    COLS = ("Stage","Time","HF","Rounds","A","C","D","M","P","NS")
-    COL_FIXED = {"Time":74,"HF":74,"Rounds":60,"A":48,"C":48,"D":48,"M":48,"P":48,"NS":48}
+    COLS = ("Stage","Time","HF","Rounds","A","C","D","M","P","NS","Pts","Total","%")
+    COL_FIXED = {"Time":74,"HF":74,"Rounds":60,"A":48,"C":48,"D":48,"M":48,"P":48,"NS":48,"Pts":56,"Total":74,"%":64}
+    DERIVED = {"Pts":"Points","Total":"TotalTime","%":"StagePct"}   # read-only, from MatchStats
     ROW_H=28; HEAD_H=26; ACCENT_W=3
     FONT_HEAD=("Segoe UI",8,"bold"); FONT_ROW=("Segoe UI",10); PAD_LEFT=10
 
-    def __init__(self, master, on_double_click=None, **kw):
+    def __init__(self, master, on_double_click=None, on_select=None, **kw):
         super().__init__(master, bg=C_BG, **kw)
-        self._stages=[]; self._selected=None; self._hovered=None
-        self._on_dbl=on_double_click; self._col_widths={}; self._edit_entry=None
+        self._stages=[]; self._stats=None; self._selected=None; self._hovered=None
+        self._drawn_rows=(0,0); self._redraw_pending=False
+        self._on_dbl=on_double_click; self._on_sel=on_select; self._col_widths={}; self._edit_entry=None
         self._sb_canvas   = tk.Canvas(self, width=10,  bg=C_BG, highlightthickness=0, bd=0)
         self._sb_h_canvas = tk.Canvas(self, height=10, bg=C_BG, highlightthickness=0, bd=0)
         self._cv = tk.Canvas(self, bg=C_BG, highlightthickness=0,
@@ -337,6 +1293,9 @@ class CanvasTable(tk.Frame):
         if self._sb_first<=0.0 and self._sb_last>=1.0: self._sb_canvas.pack_forget()
         else: self._sb_canvas.pack(side="right", fill="y", before=self._cv)
         self._sb_draw()
+        # Only visible rows are drawn — redraw once idle when scrolling exposes others.
+        if self._visible_rows()!=self._drawn_rows and not self._redraw_pending:
+            self._redraw_pending=True; self.after_idle(self.redraw)
 
     def _sb_draw(self):
         sc=self._sb_canvas; sc.delete("all")
@@ -374,9 +1333,10 @@ class CanvasTable(tk.Frame):
         self._cv.xview_moveto(max(0.0,min(self._sb_h_drag_start_left+delta,1.0-(self._sb_h_last-self._sb_h_first))))
     def _sb_h_on_release(self, event): self._sb_h_dragging=False; self._sb_h_draw()
 
-    def load(self, stages):
-        self._stages=stages; self._selected=None; self._hovered=None
+    def load(self, stages, stats=None):
+        self._stages=stages; self._stats=stats; self._selected=None; self._hovered=None
         self._layout(self._cv.winfo_width() or 800); self.redraw()
+    def set_stats(self, stats): self._stats=stats; self.redraw()
     def get_selected_index(self): return self._selected
 
     def _layout(self, total_w):
@@ -391,6 +1351,12 @@ class CanvasTable(tk.Frame):
         return x
 
     def _row_y(self, idx): return self.HEAD_H+idx*self.ROW_H
+    def _visible_rows(self):
+        """(first, last) row range intersecting the viewport, last exclusive."""
+        top=int(self._cv.canvasy(0)); h=self._cv.winfo_height()
+        if h<=1: h=600
+        first=max(0,(top-self.HEAD_H)//self.ROW_H)
+        return first, max(first,min(len(self._stages),(top+h-self.HEAD_H)//self.ROW_H+1))
     def _row_at_y(self, y):
         if y<self.HEAD_H: return None
         idx=(y-self.HEAD_H)//self.ROW_H
@@ -404,7 +1370,7 @@ class CanvasTable(tk.Frame):
         return None
 
     def redraw(self):
-        cv=self._cv; cv.delete("all")
+        cv=self._cv; cv.delete("all"); self._redraw_pending=False
         total_w=cv.winfo_width() or 800; self._layout(total_w)
         oc=get_overlay_colors(); hit_hex={k:_rgb_to_hex(oc[k]) for k in ("A","C","D","M","P","NS")}
         total_h=self.HEAD_H+len(self._stages)*self.ROW_H
@@ -417,8 +1383,9 @@ class CanvasTable(tk.Frame):
             tx=(x+self.PAD_LEFT) if col=="Stage" else (x+w//2)
             cv.create_text(tx,self.HEAD_H//2,text=col.upper(),fill=C_TEXT_HINT,
                 font=self.FONT_HEAD,anchor="w" if col=="Stage" else "center")
-        for i,s in enumerate(self._stages):
-            ry=self._row_y(i); isel=(i==self._selected); ihov=(i==self._hovered)
+        first,last=self._drawn_rows=self._visible_rows()
+        for i in range(first,last):
+            s=self._stages[i]; ry=self._row_y(i); isel=(i==self._selected); ihov=(i==self._hovered)
             row_bg=C_ROW_SEL if isel else (C_ROW_HOVER if ihov else (C_ROW_EVEN if i%2==0 else C_ROW_ODD))
             cv.create_rectangle(self.ACCENT_W,ry,total_w,ry+self.ROW_H,fill=row_bg,outline="")
             cv.create_line(self.ACCENT_W,ry+self.ROW_H-1,total_w,ry+self.ROW_H-1,fill=C_BORDER,width=1)
@@ -434,6 +1401,10 @@ class CanvasTable(tk.Frame):
             for k in ("A","C","D","M","P","NS"):
                 val=s.get(k,0)
                 self._dc(cv,k,ty,str(val),hit_hex[k] if int(val or 0)>0 else C_TEXT_HINT)
+            if self._stats is not None and i<len(self._stats):
+                for col,key in self.DERIVED.items():
+                    val=self._stats.columns[key][i]
+                    self._dc(cv,col,ty,"" if val is None else (f"{val:.2f}" if isinstance(val,float) else str(val)),C_TEXT_DIM)
         for col in self.COLS[1:]:
             x=self._col_x(col); cv.create_line(x,0,x,total_h,fill=C_BORDER,width=1)
 
@@ -447,7 +1418,9 @@ class CanvasTable(tk.Frame):
         if e and e.winfo_exists(): e.event_generate("<Return>")
     def _on_click(self, event):
         self._commit_edit(); y=self._cv.canvasy(event.y); idx=self._row_at_y(int(y))
-        if idx is not None: self._selected=idx; self.redraw()
+        if idx is not None:
+            self._selected=idx; self.redraw()
+            if self._on_sel: self._on_sel(idx)
     def _on_double(self, event):
         y=self._cv.canvasy(event.y); idx=self._row_at_y(int(y)); col=self._col_at_x(event.x)
         if idx is not None and col is not None and self._on_dbl: self._on_dbl(idx,col)
@@ -487,11 +1460,22 @@ class ScoringApp(tk.Tk):
 
         # Dark title bar deferred — see _apply_dark_titlebar called via after(100) below.
 
-        self.session = None; self.stages = []
+        self.session = None; self.stages = StageStore(); self._stats = None; self.overlay_server = None
+        self._job_progress = {}; self._jobs_window = None; self._import_target = None; self._stats_job = None
+        self.events = UIEventBus()
+        self.events.subscribe(EV_PROGRESS,  self._on_job_progress)
+        self.events.subscribe(EV_DONE,      self._on_job_done)
+        self.events.subscribe(EV_ERROR,     self._on_job_error)
+        self.events.subscribe(EV_CANCELLED, self._on_job_cancelled)
+        self.events.subscribe(EV_JOBS,      self._on_jobs_changed)
+        self.events.subscribe(EV_ROWS,      self._on_import_rows)
+        self.events.attach(self)
+        self.jobs = JobScheduler(self.events)
         if _first_run: self.after(200, self._show_first_run_welcome)
         self._build_ui()
         self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.after(100, self._apply_dark_titlebar)
+        self._sync_overlay_server()
 
     def _apply_dark_titlebar(self):
         self.update_idletasks()
@@ -517,10 +1501,14 @@ class ScoringApp(tk.Tk):
         tk.Label(hdr, text="SSI Scoring Overlay", bg=C_SURFACE,
             fg=C_TEXT, font=("Segoe UI",10,"bold")).pack(side="left", padx=(0,12))
         for text, cmd in (("\u2699 Settings", self.on_settings),
+            ("Export Animated", self.on_export_animated),
             ("Export Overlays", self.on_export_overlays),
             ("Export CSV", self.on_export_csv),
+            ("Import", self.on_import),
             ("Preview Overlay", self.on_preview)):
             tk.Button(hdr, text=text, command=cmd, **BTN_STYLE).pack(side="right", padx=2, pady=6)
+        self._jobs_btn = tk.Button(hdr, text="Jobs", command=self.on_jobs, **BTN_STYLE)
+        self._jobs_btn.pack(side="right", padx=2, pady=6)
         self._scrape_btn = tk.Button(hdr, text="Scrape", command=self.on_scrape, **BTN_PRIMARY)
         self._scrape_btn.pack(side="right", padx=(2,4), pady=6)
 
@@ -545,8 +1533,12 @@ class ScoringApp(tk.Tk):
         self._status_time = tk.Label(sb, text="", bg=C_SURFACE,
             fg=C_TEXT_HINT, font=("Segoe UI",8))
         self._status_time.pack(side="left", padx=12, pady=4)
+        self._status_server = tk.Label(sb, text="", bg=C_SURFACE,
+            fg=C_TEXT_HINT, font=("Segoe UI",8))
+        self._status_server.pack(side="right", padx=12, pady=4)
 
-        self.table = CanvasTable(self, on_double_click=self._on_edit_cell)
+        self.table = CanvasTable(self, on_double_click=self._on_edit_cell,
+            on_select=self._on_select_row)
         self.table.pack(fill="both", expand=True)
 
     def _set_status_connected(self, ok):
@@ -556,15 +1548,6 @@ class ScoringApp(tk.Tk):
         self._status_conn.config(text=text, fg=fg or C_TEXT_DIM)
     def _set_status_time(self):
         self._status_time.config(text=f"Last scraped {datetime.datetime.now().strftime('%H:%M')}")
-    def _set_scrape_btn(self, enabled):
-        self._scrape_btn.configure(state="normal" if enabled else "disabled")
-    def _set_btn_state(self, fragment, enabled):
-        state = "normal" if enabled else "disabled"
-        for w in self.winfo_children():
-            if isinstance(w, tk.Frame):
-                for child in w.winfo_children():
-                    if isinstance(child, tk.Button) and fragment in child["text"]:
-                        child.configure(state=state)
 
     def _show_first_run_welcome(self):
         dark_dialog(self, "Welcome to SSI Scoring Overlay",
@@ -573,10 +1556,61 @@ class ScoringApp(tk.Tk):
             "and password before scraping.")
         SettingsWindow(self)
 
-    def _refresh_table(self): self.table.load(self.stages)
+    def _refresh_table(self):
+        self.table.load(self.stages); self._recompute_stats(); self._sync_overlay_server()
+
+    def _power_factor(self): return str(CONFIG.get("power_factor","minor")).strip().lower()
+
+    def _recompute_stats(self):
+        """Recompute MatchStats for the current rows as a background job.
+
+        Until it finishes the table keeps its previous derived columns and
+        _overlay_rows() leaves the statistics to whoever reads the rows.
+        """
+        self._stats=None
+        if self._stats_job and self._stats_job.active: self.jobs.cancel(self._stats_job)
+        rows=self.stages.snapshot(); pf=self._power_factor()
+        def _run(job):
+            stats=compute_match_stats(rows,pf); job.check_cancelled()
+            return dict(rows=rows,stats=stats)
+        self._stats_job=self.jobs.submit("stats",f"Statistics for {len(rows)} row(s)",_run)
+
+    def _finish_stats(self, rows, stats):
+        if rows.version!=self.stages.version or stats.power_factor!=self._power_factor(): return   # rows changed since
+        self._stats=stats; self.table.set_stats(stats); self._sync_overlay_server()
+
+    def _overlay_rows(self):
+        """Stage dicts merged with their derived statistics, for templates that show them."""
+        stats=self._stats if self._stats and self._stats.power_factor==self._power_factor() else None
+        return StatRows(self.stages.snapshot(),stats,self._power_factor())
+
+    def _apply_settings(self):
+        if self._stats is None or self._stats.power_factor!=self._power_factor(): self._recompute_stats()
+        self.table.redraw(); self._sync_overlay_server()
+
+    def _sync_overlay_server(self):
+        """Start/stop the overlay server per CONFIG and push the current stages to it."""
+        enabled=bool(CONFIG.get("overlay_server",False))
+        try: port=int(CONFIG.get("overlay_server_port",8765))
+        except (TypeError,ValueError): port=8765
+        srv=self.overlay_server
+        if srv and (not enabled or srv.port!=port):
+            srv.stop(); self.overlay_server=srv=None; self._status_server.config(text="")
+        if enabled and srv is None:
+            try:
+                srv=OverlayServer(port); srv.start(); self.overlay_server=srv
+                self._status_server.config(text=f"Overlay server http://127.0.0.1:{port}/current.png")
+            except OSError as e:
+                logger.error("Overlay server failed to start on port %s: %s",port,e)
+                self._status_server.config(text=f"Overlay server failed (port {port})")
+                return
+        if srv: srv.update(self._overlay_rows()); srv.select(self.table.get_selected_index())
+
+    def _on_select_row(self, idx):
+        if self.overlay_server: self.overlay_server.select(idx)
 
     def _on_edit_cell(self, row_idx, col_name):
-        if not self.stages or row_idx >= len(self.stages): return
+        if not self.stages or row_idx >= len(self.stages) or col_name in CanvasTable.DERIVED: return
         cv=self.table._cv; x=self.table._col_x(col_name)
         w=self.table._col_widths.get(col_name,80)
         wy=self.table._row_y(row_idx)-int(cv.canvasy(0))
@@ -591,7 +1625,8 @@ class ScoringApp(tk.Tk):
         def save(event=None):
             if _saved[0]: return
             _saved[0]=True; new_val=entry.get(); entry.destroy()
-            self.table._edit_entry=None; self.stages[row_idx][col_name]=new_val; self.table.redraw()
+            self.table._edit_entry=None; self.stages[row_idx]={**self.stages[row_idx],col_name:new_val}
+            self._recompute_stats(); self.table.redraw(); self._sync_overlay_server()
         def cancel(event=None):
             _saved[0]=True; entry.destroy(); self.table._edit_entry=None
         entry.bind("<Return>",save); entry.bind("<FocusOut>",save); entry.bind("<Escape>",cancel)
@@ -604,24 +1639,18 @@ class ScoringApp(tk.Tk):
                 "No username or password set.\n\n"
                 "Please open \u2699 Settings and enter your Shoot'n Score It credentials before scraping.",
                 kind="error"); return
-        self._set_scrape_btn(False); self._set_status_connected(False)
-        def _run():
+        self._set_status_connected(False)
+        def _run(job):
             try:
                 stages=[]; dbf=app_dir()/"debug_rows.csv"
-                if DEBUG_MODE and dbf.exists(): stages=scrape_scores_debug_from_csv()
+                if DEBUG_MODE and dbf.exists(): stages=scrape_scores_debug_from_csv(check=job.check_cancelled)
                 if not stages:
-                    self.session=create_logged_in_session()
-                    stages=scrape_scores_live(self.session,url)
+                    job.progress("Logging in\u2026")
+                    self.session=create_logged_in_session(); job.check_cancelled()
+                    job.progress("Fetching scores\u2026")
+                    stages=scrape_scores_live(self.session,url,check=job.check_cancelled)
                 stages=[normalize_stage(s) for s in stages]
-                if not stages:
-                    self.after(0,lambda:(dark_dialog(self,"No data","No valid stages found at that URL.",kind="error"),self._set_scrape_btn(True))); return
-                def _done():
-                    self.stages=stages; self._refresh_table(); self._set_status_connected(True)
-                    self._set_status_time(); CONFIG["last_match_url"]=url; save_config(); self._set_scrape_btn(True)
-                    if DEBUG_MODE:
-                        src="debug_rows.csv" if dbf.exists() else "online"
-                        dark_dialog(self,"Success",f"DEBUG_MODE ON — {len(stages)} stages from {src}.")
-                self.after(0,_done)
+            except JobCancelled: raise
             except Exception as e:
                 import traceback; traceback.print_exc(); logger.error("Scraping failed: %s",e,exc_info=True)
                 err_str=str(e)
@@ -633,50 +1662,167 @@ class ScoringApp(tk.Tk):
                     f"Something went wrong while fetching scores.\n\n"
                     f"Check the URL and your internet connection.\n\nDetail: {err_str}"
                 )
-                self.after(0,lambda t=title,m=msg:(dark_dialog(self,t,m,kind="error"),self._set_scrape_btn(True)))
-        threading.Thread(target=_run,daemon=True).start()
+                raise JobError(title,msg) from e
+            if not stages: raise JobError("No data","No valid stages found at that URL.")
+            return dict(stages=stages,url=url,src="debug_rows.csv" if dbf.exists() else "online")
+        self.jobs.submit("scrape",f"Scrape {url.rstrip('/').rsplit('/',1)[-1]}",_run)
+
+    def _finish_scrape(self, stages, url, src):
+        self._import_target=None; self.stages=StageStore(stages); self._refresh_table(); self._set_status_connected(True)
+        self._set_status_time(); CONFIG["last_match_url"]=url; save_config()
+        if DEBUG_MODE:
+            dark_dialog(self,"Success",f"DEBUG_MODE ON — {len(stages)} stages from {src}.")
+
+    def on_import(self):
+        """Queue a streaming import of a CSV or JSON Lines stage file into the table."""
+        path=filedialog.askopenfilename(title="Import stages",
+            filetypes=[("Stage files","*.csv *.jsonl *.ndjson"),("All files","*.*")])
+        if not path: return
+        def _run(job):
+            # The table drains chunks on the Tk thread; at most IMPORT_MAX_PENDING_CHUNKS
+            # may wait in the event queue, so the parser never runs far ahead of the UI.
+            slots=threading.Semaphore(IMPORT_MAX_PENDING_CHUNKS); rows=0; errors=0; samples=[]
+            try:
+                for stages,errs in iter_stage_file(path,check=job.check_cancelled):
+                    for line_no,msg in errs:
+                        if errors<100: logger.error("Import %s line %d: %s",path,line_no,msg)
+                        if len(samples)<IMPORT_ERRORS_SHOWN: samples.append((line_no,msg))
+                        errors+=1
+                    if not stages: continue
+                    while not slots.acquire(timeout=0.2): job.check_cancelled()
+                    self.events.post(EV_ROWS,job,stages=stages,first=rows==0,release=slots.release)
+                    rows+=len(stages); job.progress(f"Importing {rows} rows\u2026")
+            except (JobCancelled,JobError): raise
+            except Exception as e:
+                logger.error("Import failed: %s",e,exc_info=True)
+                raise JobError("Import failed",f"Could not read {path}:\n{e}") from e
+            if not rows: raise JobError("No data",f"No valid stages found in {path}.")
+            return dict(path=path,rows=rows,errors=errors,samples=samples)
+        self.jobs.submit("import",f"Import {os.path.basename(path)}",_run)
+
+    def _on_import_rows(self, ev):
+        try:
+            if ev.payload["first"]:
+                self._import_target=ev.job.id; self.stages=StageStore(); self._stats=None; self.table.load(self.stages)
+            if ev.job.id!=self._import_target: return   # superseded by a newer import or scrape
+            self.stages.extend(ev.payload["stages"]); self._stats=None; self.table.redraw()
+        finally: ev.payload["release"]()
+
+    def _finish_import(self, path, rows, errors, samples):
+        msg=f"{rows} stage row(s) imported from {os.path.basename(path)}."
+        if errors:
+            msg+=f"\n\n{errors} malformed row(s) skipped:\n"+"\n".join(f"  line {n}: {m}" for n,m in samples)
+            if errors>len(samples): msg+="\n  \u2026 (see log for more)"
+        dark_dialog(self,"Import complete",msg,kind="warning" if errors else "info")
 
     def on_preview(self):
         if not self.stages: dark_dialog(self, "No data", "Scrape first.", kind="warning"); return
-        idx=self.table.get_selected_index(); PreviewWindow(self,self.stages,idx if idx is not None else 0)
+        idx=self.table.get_selected_index(); PreviewWindow(self,self._overlay_rows(),idx if idx is not None else 0)
 
     def on_export_csv(self):
         if not self.stages: dark_dialog(self, "No data", "Scrape first.", kind="warning"); return
         path=filedialog.asksaveasfilename(defaultextension=".csv",filetypes=[("CSV","*.csv")])
         if not path: return
-        cols=("Stage","Time","HF","Rounds","A","C","D","M","NS","P")
+        cols=("Stage","Time","HF","Rounds","A","C","D","M","NS","P")+STAT_COLUMNS
         with open(path,"w",newline="",encoding="utf-8") as f:
             w=csv.DictWriter(f,fieldnames=cols); w.writeheader()
-            for s in self.stages: w.writerow({c:s.get(c,"") for c in cols})
+            for s in self._overlay_rows(): w.writerow({c:"" if s.get(c) is None else s.get(c) for c in cols})
         dark_dialog(self, "Saved", f"CSV saved to {path}")
 
     def on_export_overlays(self):
-        """Export overlays in a background thread with status bar progress."""
+        """Queue an overlay export job for the stages currently in the table."""
         if not self.stages: dark_dialog(self, "No data", "Scrape first.", kind="warning"); return
         outdir=OUTPUT_DIR; outdir.mkdir(parents=True,exist_ok=True)
-        stages=list(self.stages); total=len(stages)
-        self._set_scrape_btn(False); self._set_btn_state("Export Overlays",False)
-        def _run():
+        stages=self._overlay_rows(); total=len(stages)
+        def _run(job):
             try:
                 for i,s in enumerate(stages,start=1):
-                    self.after(0,lambda i=i:self._set_status_text(f"Exporting {i}/{total}\u2026",C_TEXT_DIM))
-                    safe=s.get("Stage",f"stage_{i}").replace(" ","_").replace(".","")
-                    make_overlay(s,font_path=FONT_PATH,outpath=str(outdir/f"{safe}.png"))
-                def _done():
-                    self._set_status_connected(bool(self.stages))
-                    self._set_scrape_btn(True); self._set_btn_state("Export Overlays",True)
-                    dark_dialog(self, "Export complete", f"{total} overlay(s) saved to {outdir}")
-                self.after(0,_done)
+                    job.check_cancelled(); job.progress(f"Exporting {i}/{total}\u2026")
+                    make_overlay(s,font_path=FONT_PATH,outpath=str(outdir/f"{overlay_filename(s,i,total)}.png"))
+            except JobCancelled: raise
             except Exception as e:
                 logger.error("Export overlays failed: %s",e,exc_info=True)
-                self.after(0,lambda m=str(e):(self._set_scrape_btn(True),self._set_btn_state("Export Overlays",True),dark_dialog(self,"Export failed",f"Export failed:\n{m}",kind="error")))
-        threading.Thread(target=_run,daemon=True).start()
+                raise JobError("Export failed",f"Export failed:\n{e}") from e
+            return dict(total=total,outdir=outdir)
+        self.jobs.submit("export",f"Export {total} overlay(s)",_run)
+
+    def _finish_export(self, total, outdir):
+        dark_dialog(self, "Export complete", f"{total} overlay(s) saved to {outdir}")
+
+    def on_export_animated(self):
+        """Queue an animated export: one PNG sequence (or APNG) per stage, stages rendered in parallel."""
+        if not self.stages: dark_dialog(self, "No data", "Scrape first.", kind="warning"); return
+        try: fps=max(1,int(CONFIG.get("anim_fps",60))); duration=max(0.1,float(CONFIG.get("anim_duration",1.5)))
+        except (TypeError,ValueError):
+            dark_dialog(self,"Invalid settings","Animation FPS and seconds must be numbers.",kind="error"); return
+        fmt="apng" if str(CONFIG.get("anim_format","png")).strip().lower()=="apng" else "png"
+        outdir=OUTPUT_DIR/"animated"; outdir.mkdir(parents=True,exist_ok=True)
+        stages=self._overlay_rows(); nframes=max(2,int(round(fps*duration))); total=len(stages)*nframes
+        def _run(job):
+            plan=get_render_plan(FONT_PATH); done=[0]; lock=threading.Lock()
+            def _tick():
+                with lock: done[0]+=1; n=done[0]
+                job.progress(f"Animating {n}/{total} frames\u2026")
+            def _one(i,s):
+                safe=overlay_filename(s,i,len(stages))   # parallel workers must never share an output path
+                base=outdir/safe if fmt=="apng" else outdir/safe/safe
+                base.parent.mkdir(parents=True,exist_ok=True)
+                try:
+                    render_overlay_sequence(s,base,fps=fps,duration=duration,fmt=fmt,plan=plan,
+                        check=job.check_cancelled,on_frame=_tick)
+                except Exception:
+                    if fmt!="apng":   # the row's sequence folder, now empty
+                        try: base.parent.rmdir()
+                        except OSError: pass
+                    raise
+            with ThreadPoolExecutor(max_workers=ANIM_APNG_WORKERS if fmt=="apng" else ANIM_WORKERS) as ex:
+                futures=[ex.submit(_one,i,s) for i,s in enumerate(stages,start=1)]
+                try:
+                    for fut in as_completed(futures): fut.result()
+                except JobCancelled: raise
+                except Exception as e:
+                    job.cancel()   # stop the other stages at their next frame
+                    logger.error("Animated export failed: %s",e,exc_info=True)
+                    raise JobError("Export failed",f"Animated export failed:\n{e}") from e
+            return dict(count=len(stages),frames=nframes,outdir=outdir)
+        self.jobs.submit("animate",f"Animate {len(stages)} stage(s)",_run)
+
+    def _finish_animate(self, count, frames, outdir):
+        dark_dialog(self, "Export complete", f"{count} animated overlay(s) of {frames} frames saved to {outdir}")
+
+    def on_jobs(self):
+        if self._jobs_window and self._jobs_window.winfo_exists(): self._jobs_window.lift(); return
+        self._jobs_window=JobsWindow(self,self.jobs)
+
+    # --- background job events (dispatched on the Tk thread by UIEventBus) ---
+    def _show_job_progress(self):
+        self._set_status_text("  \u00b7  ".join(self._job_progress.values()),C_TEXT_DIM)
+    def _on_job_progress(self, ev):
+        if not ev.job.active: return
+        self._job_progress[ev.job.id]=ev.payload["text"]; self._show_job_progress()
+    def _end_job(self, job):
+        self._job_progress.pop(job.id,None)
+        if job.kind=="import" and job.id==self._import_target: self._recompute_stats(); self._sync_overlay_server()
+        if self._job_progress: self._show_job_progress()
+        elif job.kind!="stats": self._set_status_connected(bool(self.stages) and job.kind!="scrape")
+    def _on_job_done(self, ev):
+        self._end_job(ev.job); getattr(self,f"_finish_{ev.job.kind}")(**ev.payload)
+    def _on_job_error(self, ev):
+        self._end_job(ev.job); dark_dialog(self,ev.payload["title"],ev.payload["message"],kind="error")
+    def _on_job_cancelled(self, ev):
+        self._end_job(ev.job)
+    def _on_jobs_changed(self, ev):
+        active=sum(1 for j in self.jobs.jobs() if j.active)
+        self._jobs_btn.configure(text=f"Jobs ({active})" if active else "Jobs")
+        if self._jobs_window and self._jobs_window.winfo_exists(): self._jobs_window.refresh()
 
     def on_settings(self): SettingsWindow(self)
 
     def on_close(self):
         CONFIG["window_geometry"]=self.geometry(); CONFIG["last_match_url"]=self.match_var.get().strip()
-        save_config(); self.destroy()
+        save_config()
+        if self.overlay_server: self.overlay_server.stop()
+        self.destroy()
 
 
 # ============================================================
@@ -717,7 +1863,7 @@ class PreviewWindow(tk.Toplevel):
 
     def save_current_png(self):
         s=self.stages[self.index]
-        name=s.get("Stage",f"stage_{self.index}").replace(" ","_").replace(".","")
+        name=overlay_filename(s,self.index+1,len(self.stages))
         path=filedialog.asksaveasfilename(defaultextension=".png",initialfile=f"{name}.png",filetypes=[("PNG files","*.png")])
         if not path: return
         make_overlay(s,font_path=FONT_PATH,outpath=path)
@@ -729,12 +1875,74 @@ class PreviewWindow(tk.Toplevel):
         if self.index<len(self.stages)-1: self.index+=1; self.show_stage()
 
 
+# ============================================================
+# JOBS WINDOW
+# ============================================================
+class JobsWindow(tk.Toplevel):
+    """Queued, running and finished background jobs with durations and a Cancel button."""
+    _STATE_FG={Job.QUEUED:C_TEXT_DIM,Job.RUNNING:C_HF,Job.DONE:"#22c55e",Job.FAILED:"#ef4444",Job.CANCELLED:C_TEXT_HINT}
+
+    def __init__(self, master, scheduler):
+        super().__init__(master)
+        self.title("Jobs"); self.configure(bg="#111111"); self.transient(master)
+        self.scheduler=scheduler; self._rows={}
+        self._body=tk.Frame(self,bg="#111111"); self._body.pack(fill="both",expand=True,padx=16,pady=(14,6))
+        self._empty=tk.Label(self._body,text="No jobs yet.",bg="#111111",fg=C_TEXT_HINT,font=("Segoe UI",9))
+        bf=tk.Frame(self,bg="#111111"); bf.pack(pady=(4,12))
+        tk.Button(bf,text="Clear finished",command=self.scheduler.clear_finished,**BTN_STYLE).pack(side="left",padx=6)
+        tk.Button(bf,text="Close",command=self.destroy,**BTN_STYLE).pack(side="left",padx=6)
+        self.bind("<Escape>",lambda e:self.destroy())
+        self.minsize(460,0); self.refresh(); self._tick()
+        def _fix_titlebar():
+            _dark_titlebar_toplevel(self); self.withdraw(); self.deiconify()
+        self.after(10, _fix_titlebar)
+
+    def _tick(self):
+        if not self.winfo_exists(): return
+        self._update_durations(); self.after(500,self._tick)
+
+    @staticmethod
+    def _fmt_duration(job):
+        d=job.duration()
+        return "" if d is None else f"{d:.1f}s"
+
+    def refresh(self):
+        jobs=self.scheduler.jobs(); ids={j.id for j in jobs}
+        for jid in [k for k in self._rows if k not in ids]: self._rows.pop(jid)[0].destroy()
+        for job in jobs:
+            row=self._rows.get(job.id)
+            if row is None:
+                fr=tk.Frame(self._body,bg="#111111")
+                name=tk.Label(fr,text=job.name,bg="#111111",fg=C_TEXT,font=("Segoe UI",9),width=28,anchor="w")
+                state=tk.Label(fr,bg="#111111",font=("Segoe UI",8),width=10,anchor="w")
+                dur=tk.Label(fr,bg="#111111",fg=C_TEXT_DIM,font=("Segoe UI",8),width=8,anchor="e")
+                btn=tk.Button(fr,text="Cancel",command=lambda j=job:self.scheduler.cancel(j),**BTN_STYLE)
+                for w in (name,state,dur): w.pack(side="left",padx=(0,6))
+                btn.pack(side="left",padx=(6,0))
+                row=self._rows[job.id]=(fr,state,dur,btn,job)
+            fr,state,dur,btn,_=row
+            fr.pack_forget(); fr.pack(fill="x",pady=2)
+            state.config(text=job.state,fg=self._STATE_FG.get(job.state,C_TEXT_DIM))
+            dur.config(text=self._fmt_duration(job))
+            btn.configure(state="normal" if job.active else "disabled")
+        if jobs: self._empty.pack_forget()
+        else: self._empty.pack(pady=8)
+
+    def _update_durations(self):
+        for _,state,dur,_,job in self._rows.values():
+            if job.state==Job.RUNNING: dur.config(text=self._fmt_duration(job))
+
+
 # ============================================================
 # SETTINGS WINDOW
 # ============================================================
 class SettingsWindow(tk.Toplevel):
     _FIELDS=[("ssi_username","SSI Username","text"),("ssi_password","SSI Password","password"),
-        ("font_path","Font Path","path"),("output_dir","Output Dir","path"),("debug_mode","Debug Mode","bool")]
+        ("font_path","Font Path","path"),("overlay_template","Overlay Template","path"),
+        ("output_dir","Output Dir","path"),("debug_mode","Debug Mode","bool"),
+        ("power_factor","Power Factor","text"),
+        ("anim_fps","Animation FPS","text"),("anim_duration","Animation Seconds","text"),("anim_format","Animation Format","text"),
+        ("overlay_server","Overlay Server","bool"),("overlay_server_port","Server Port","text")]
     _COLOR_LABELS=[("A","A"),("C","C"),("D","D"),("M","M (Mike)"),("NS","NS"),
         ("P","P (Proc.)"),("bg","Pill background"),("outline","Pill outline")]
 
@@ -768,7 +1976,9 @@ class SettingsWindow(tk.Toplevel):
                 tk.Entry(fr,textvariable=var,**entry_cfg).pack(side="left")
                 def _mb(v=var,k=key):
                     def _b():
-                        r=(filedialog.askopenfilename(title="Select font file",filetypes=[("Font files","*.ttf *.otf"),("All files","*.*")],initialfile=v.get() or "") if k=="font_path" else filedialog.askdirectory(title="Select output directory",initialdir=v.get() or "."))
+                        r=(filedialog.askopenfilename(title="Select font file",filetypes=[("Font files","*.ttf *.otf"),("All files","*.*")],initialfile=v.get() or "") if k=="font_path"
+                           else filedialog.askopenfilename(title="Select overlay template",filetypes=[("Templates","*.json *.toml"),("All files","*.*")],initialfile=v.get() or "") if k=="overlay_template"
+                           else filedialog.askdirectory(title="Select output directory",initialdir=v.get() or "."))
                         if r: v.set(r)
                     return _b
                 tk.Button(fr,text="Browse…",command=_mb(),**BTN_STYLE).pack(side="left",padx=(6,0))
@@ -833,9 +2043,10 @@ class SettingsWindow(tk.Toplevel):
         for key,var in self._vars.items():
             val=var.get(); CONFIG[key]=bool(val) if isinstance(var,tk.BooleanVar) else str(val).strip()
         CONFIG["colors"]={k:v for k,v in self._color_values.items()}; save_config()
+        self.master._apply_settings()
         dark_dialog(self, "Settings saved",
             "All changes have been saved.\n\n"
-            "Credentials and color changes take effect immediately on the next scrape or export.\n\n"
+            "Credentials, color and template changes take effect immediately on the next scrape or export.\n\n"
             "Font path and output directory changes require a restart to take effect.",
             kind="info")
         self.destroy()